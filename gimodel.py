@@ -2,11 +2,20 @@
 Gi model.
 This is the data model for Gio interface as seen by the UI module.
 """
+import sys
 import gi
 gi.require_version("Gio", "2.0")
 from gi.repository import Gio
 from gi.repository import GLib
 
+# Basic (non-container) GVariant type strings, as a set for fast membership tests
+_BASE_TYPES = frozenset("bynqiuxtdsog")
+# Arrays and dictionaries of basic types hold no nested variants,
+# so GLib can unpack them in one call
+_BULK_SAFE_TYPES = frozenset(
+    ["a" + t for t in _BASE_TYPES] +
+    ["a{" + k + v + "}" for k in _BASE_TYPES for v in _BASE_TYPES])
+
 class GlVariant(GLib.Variant):
     """
     GlVariant
@@ -35,6 +44,9 @@ class GlVariant(GLib.Variant):
     base_type_sig : str = "bynqiuxtdsog"
     composite_type_sig : str = "mav@({"
 
+    # Value shapes used by unpack_preserve_variants
+    _PRIMITIVE, _PRESERVE, _LIST, _TUPLE, _DICT = range(5)
+
     @staticmethod
     def AssureVariant(vt_str, input):
         if isinstance(input, GLib.Variant):
@@ -47,28 +59,70 @@ class GlVariant(GLib.Variant):
         if not isinstance(variant, GLib.Variant):
             return variant  # Return non-variant values as-is
 
-        type_str = variant.get_type_string()
-
-        if type_str == 'v':  # Preserve inner variants
-            return variant  
+        # Local names for everything used inside the loops
+        PRIMITIVE = GlVariant._PRIMITIVE
+        PRESERVE = GlVariant._PRESERVE
+        LIST = GlVariant._LIST
+        TUPLE = GlVariant._TUPLE
+        DICT = GlVariant._DICT
+        bulk_safe = _BULK_SAFE_TYPES
 
-        elif type_str.startswith('a{'):  # Dictionary case (array of key-value pairs)
-            preserved_dict = {}
-            for i in range(variant.n_children()):  # Iterate through dictionary entries
-                entry = variant.get_child_value(i)
-                key = entry.get_child_value(0).unpack()
-                value = GlVariant.unpack_preserve_variants(entry.get_child_value(1))
-                preserved_dict[key] = value
-            return preserved_dict  # Properly preserves nested variants
+        # Pass 1: depth first walk recording the nodes in pre-order
+        # together with the shape of the value they unpack to.
+        nodes = []
+        record = nodes.append
+        stack = [variant]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            node = pop()
+            type_str = node.get_type_string()
+            if type_str == 'v':  # Preserve inner variants
+                record((node, PRESERVE, 0))
+                continue
+            if type_str in bulk_safe:  # Flat array or dictionary
+                record((node, PRIMITIVE, 0))
+                continue
+            lead = type_str[0]
+            if lead == 'a':
+                shape = DICT if type_str[1] == '{' else LIST
+            elif node.is_container():  # Tuples (structured types)
+                shape = TUPLE
+            else:  # Unpack primitive values
+                record((node, PRIMITIVE, 0))
+                continue
+            n = node.n_children()
+            record((node, shape, n))
+            get_child = node.get_child_value
+            for i in range(n - 1, -1, -1):
+                push(get_child(i))
 
-        elif type_str.startswith('a'):  # Generic array handling
-            return [GlVariant.unpack_preserve_variants(variant.get_child_value(i)) for i in range(variant.n_children())]
+        # Pass 2: build the values bottom-up. Walking the pre-order list
+        # backwards, the children of a node are always complete and on top
+        # of the results stack in order.
+        results = []
+        take = results.pop
+        for node, shape, n in reversed(nodes):
+            if shape == PRIMITIVE:
+                value = node.unpack()
+            elif shape == PRESERVE:
+                value = node
+            else:
+                children = [take() for i in range(n)]
+                if shape == DICT:
+                    # Dictionary entries are (key, value) tuples
+                    value = dict(children)
+                elif shape == LIST:
+                    value = children
+                else:
+                    value = tuple(children)
+            results.append(value)
+        return results[0]
 
-        elif variant.is_container():  # Tuples (structured types)
-            return tuple(GlVariant.unpack_preserve_variants(variant.get_child_value(i)) for i in range(variant.n_children()))
-
-        else:  # Unpack primitive values
-            return variant.unpack()
+    @staticmethod
+    def is_flat(vt_str):
+        # Array or dictionary of basic types
+        return vt_str in _BULK_SAFE_TYPES
 
     @staticmethod
     def new_data(vt_str):
@@ -95,6 +149,8 @@ class GiSchema:
     metadata accessible from schema. If there is or will be in the futture - this is the 
     place to add it.
     """
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name
         
@@ -106,11 +162,50 @@ class GiSchema:
         return self.name
 
 
+""" 
+Schema key metadata cache
+Reading key metadata takes several GObject calls per key, so do it once
+per schema key and share the result between all GiKeys built for it.
+The cache is keyed by schema id and key name; clear it when switching
+to a different schema source.
+"""
+_key_meta_cache = {}
+
+def _schema_key_meta(schema, key_name):
+    cache_key = (schema.get_id(), key_name)
+    if cache_key in _key_meta_cache:
+        return _key_meta_cache[cache_key]
+    meta = None
+    schema_key = schema.get_key(key_name)
+    if schema_key:
+        # Get metadata like description, default value, constraints, etc.
+        # Empty values are stored as None
+        description = schema_key.get_description()
+        default_value = schema_key.get_default_value().unpack()
+        key_type = schema_key.get_value_type().dup_string()
+        value_range = schema_key.get_range()
+        summary = schema_key.get_summary()
+        meta = (
+            description or None,
+            default_value or None,
+            key_type or None,
+            value_range.unpack() if value_range else None,
+            summary or None)
+    _key_meta_cache[cache_key] = meta
+    return meta
+
+def clear_key_meta():
+    _key_meta_cache.clear()
+
+
 class GiKey:
     """
     A class to hold data from Gio Key.
     It is used to store key data.
     """
+    __slots__ = ('schema_name', 'key_name', 'key_id', 'key_type', 'summary', 'range',
+                 'description', 'default_value', 'writable', 'value')
+
     def __init__(self, schema_name, key_name, key_id):
         # Constructor for GiData
         self.schema_name = schema_name  # The ID of the GSettings schema
@@ -126,37 +221,24 @@ class GiKey:
     
     ## String representation methods
     def __repr__(self):
-        return f"GiKey(schema_id={self.schema_id}, key={self.key})"
+        return f"GiKey(schema_name={self.schema_name}, key_name={self.key_name})"
     def __str__(self):
-        return f"{self.schema_id}.{self.key}"
+        return f"{self.schema_name}.{self.key_name}"
     def __eq__(self, other):
         if isinstance(other, GiKey):
-            return self.schema_id == other.schema_id and self.key == other.key
+            return self.schema_name == other.schema_name and self.key_name == other.key_name
         return False
     
     @classmethod
     def factory(cls, schema, settings, key_name, key_id):
-        gi_key = GiKey(schema.get_id(), key_name, key_id)
+        # All keys of a schema share one copy of its name
+        gi_key = GiKey(sys.intern(schema.get_id()), key_name, key_id)
         # Check if the value is set
-        schema_key = schema.get_key(key_name)
-        if schema_key:
+        meta = _schema_key_meta(schema, key_name)
+        if meta:
             # process the schema key
-            # Get metadata like description, default value, constraints, etc.
-            description = schema_key.get_description()
-            key_type = schema_key.get_value_type().dup_string()
-            default_value = schema_key.get_default_value().unpack()
-            value_range = schema_key.get_range()
-            summary = schema_key.get_summary()
-            if description:
-                gi_key.description = description
-            if default_value:
-                gi_key.default_value = default_value
-            if key_type:
-                gi_key.key_type = key_type
-            if value_range:
-                gi_key.range = value_range.unpack()
-            if summary:
-                gi_key.summary = summary
+            (gi_key.description, gi_key.default_value, gi_key.key_type,
+                gi_key.range, gi_key.summary) = meta
             gi_key.writable = settings.is_writable(key_name)
         return gi_key
         
@@ -196,32 +278,30 @@ class GiValue:
     """
     GiValue holds value, type and the owning key.
     """
-    
-    def __init__(self, key, value, vtype):
+    __slots__ = ('key', 'key_id', 'value', 'vtype', 'variant', 'compound', 'dict_key')
+
+    def __init__(self, key, value, vtype, compound=False, variant=False):
         self.key = key
-        self.key_id = key.get_key_id()
+        self.key_id = key.key_id
         self.value = value
         self.vtype = vtype
-        self.variant = False
-        self.compound = False
+        self.variant = variant
+        self.compound = compound
+        self.dict_key = None    # Entry key when the value is a dictionary member
         
     @classmethod
-    def factory(cls, key, value, type):
-        gi_value = GiValue(key, value, type)
-        gi_value.compound = type not in GlVariant.base_type_sig
-        return gi_value
+    def factory(cls, key, value, type, variant=False):
+        return GiValue(key, value, type, type not in _BASE_TYPES, variant)
 
     def get_key(self):
         return self.key
     
     def get_key_id(self):
-        return self.key.get_key_id()
+        return self.key_id
     
     def set_value(self, value):
-        if self.vtype == 'b' and isinstance(value,str):
-            self.value = True if value == 'True' else False
-        else:
-            self.value = value
+        # Booleans may come in as 'True'/'False' strings from the editor
+        self.value = (value == 'True') if self.vtype == 'b' and value.__class__ is str else value
         
     def get_value(self):
         return self.value
@@ -255,70 +335,79 @@ class GiDict(dict):
             raise TypeError(f"No data at {id}")
         return gi_data
     
+    # The getters below compare exact classes rather than calling isinstance,
+    # the model classes are never subclassed.
+
     # Get schema
     def get_schema(self, id):
         gi_schema = self.get(id, None)
-        if not gi_schema or not isinstance(gi_schema, GiSchema):
+        if gi_schema.__class__ is not GiSchema:
             raise TypeError(f"No schema at {id}")
         return gi_schema
     
     # Get Key
     def get_key(self, id):
         gi_key = self.get(id, None)
-        if not gi_key or not isinstance(gi_key, GiKey):
+        if gi_key.__class__ is not GiKey:
             raise TypeError(f"No key at {id}")
         return gi_key
     
     # Get Value
     def get_value(self, id):
         gi_value = self.get(id, None)
-        if not gi_value or not isinstance(gi_value, GiValue):
+        if gi_value.__class__ is not GiValue:
             raise TypeError(f"No value at {id}")
         return gi_value
         
     # Get  Key-Value pair
     def get_keyvalue(self, id):
         gi_data = self.get_data(id)
-        if isinstance(gi_data, GiKey):
-            gi_key = gi_data
-            gi_value = gi_key.get_value()
-        elif isinstance(gi_data, GiValue):
-            gi_value = gi_data
-            gi_key = gi_value.get_key()
-        else:
-            raise TypeError(f"No key or value at {id}")
-        return (gi_key, gi_value)
+        data_class = gi_data.__class__
+        if data_class is GiKey:
+            return (gi_data, gi_data.value)
+        if data_class is GiValue:
+            return (gi_data.key, gi_data)
+        raise TypeError(f"No key or value at {id}")
     
-    def add_gidata(self, current, key_id, schema, settings, name, data, variant):
+    def add_gidata(self, current, key_id, schema, settings, name, data, variant, unpacked=None, tv=None):
         # generate Keys and values
-        tv = data.get_type_string() if data != None else '?'
+        if tv is None:
+            tv = data.get_type_string() if data != None else '?'
+        if unpacked is None and data != None:
+            unpacked = data.unpack()
         # Set the root key
         root_key = current if key_id == None else key_id
 
         if key_id:
             gi_key = self.get_key(root_key)
-            value = GiValue.factory(gi_key, data.unpack(), tv)
-            value.set_variant(variant)
+            value = GiValue.factory(gi_key, unpacked, tv, variant)
+            # Remember the name, it is the entry key if the parent is a dictionary
+            value.dict_key = name
             self[current] = value
             
         else:
             gi_key = GiKey.factory(schema, settings, name, current)
             self[current] = gi_key
             if data != None:
-                value = (GiValue.factory(gi_key, data.unpack(), tv))
-                value.set_variant(variant)
-                gi_key.set_value(value)
+                gi_key.value = GiValue.factory(gi_key, unpacked, tv, variant)
+
+    # Add basic values of one key at once: items are (item id, name, value)
+    def add_values(self, key_id, vtype, items):
+        gi_key = self.get_key(key_id)
+        for item_id, name, value in items:
+            gi_value = GiValue(gi_key, value, vtype)
+            # The name is the entry key if the parent is a dictionary
+            gi_value.dict_key = name
+            self[item_id] = gi_value
 
 """ 
 common helpers
 """
-def get_defaultvalue(tree, default_value, value):
-    if default_value and  type(default_value) in [list, tuple]:
+# index is the position of the value under its parent, None for key values
+def get_defaultvalue(index, default_value, value):
+    if default_value and default_value.__class__ in (list, tuple):
     # if default is compond and value is not - select the matchiing one
-        if not value.is_compound():
-            selected_item = tree.focus()
-            parent = tree.parent(selected_item)
-            index = tree.get_children(parent).index(selected_item)
+        if not value.is_compound() and index is not None:
             selected_value = default_value[index] if index < len(default_value) else None
             return selected_value
     return default_value
@@ -3,6 +3,9 @@
  
 """
 
+# import from Python
+import functools
+
 # import tkinter
 import tkinter as tk
 from tkinter import ttk
@@ -17,6 +20,103 @@ from gi.repository import GLib
 import gimodel
 from gimodel import *
 
+""" Cached Gio lookups """
+# Schema lookup and settings construction parse schema metadata,
+# so keep them around between edits. The schema source is part of the key,
+# so schemas from different sources never mix.
+# The owning window calls clear_caches() whenever it reloads the schemas.
+@functools.lru_cache(maxsize=256)
+def lookup_schema(schema_source, schema_name):
+    return schema_source.lookup(schema_name, False)
+
+@functools.lru_cache(maxsize=256)
+def get_settings(schema_name, location):
+    if location:
+        return Gio.Settings.new_with_path(schema_name, location)
+    return Gio.Settings.new(schema_name)
+
+def clear_caches():
+    lookup_schema.cache_clear()
+    get_settings.cache_clear()
+
+# Parsed variant types, by type string
+@functools.lru_cache(maxsize=512)
+def _vtype(vt_str):
+    return GLib.VariantType(vt_str)
+
+# Typed constructors for basic types. They skip the type string parsing
+# done by the generic GLib.Variant constructor.
+_PRIM_CTORS = {
+    'b': GLib.Variant.new_boolean,
+    'y': GLib.Variant.new_byte,
+    'n': GLib.Variant.new_int16,
+    'q': GLib.Variant.new_uint16,
+    'i': GLib.Variant.new_int32,
+    'u': GLib.Variant.new_uint32,
+    'x': GLib.Variant.new_int64,
+    't': GLib.Variant.new_uint64,
+    'd': GLib.Variant.new_double,
+    's': GLib.Variant.new_string,
+    'o': GLib.Variant.new_object_path,
+    'g': GLib.Variant.new_signature,
+}
+
+# Create a variant, using the typed constructor if there is one
+def _new_variant(vt_str, value):
+    ctor = _PRIM_CTORS.get(vt_str)
+    return ctor(value) if ctor else GlVariant(vt_str, value)
+
+""" Variant gathering handlers """
+# Each handler builds the value of one compound tree node from the
+# already gathered values of its children. Inside a container the value
+# stays plain Python data, the outermost node becomes a variant.
+
+# Array or dictionary
+def _handle_array_or_dict(gi_dict, gi_value, children, results, container):
+    vt_str = gi_value.vtype
+    if vt_str[1] == '{':
+        #dictionary, entry keys are kept on the values
+        data = {gi_dict[c].dict_key: results[c] for c in children}
+    else:
+        data = [results[c] for c in children]
+    return data if container else GlVariant(vt_str, data)
+
+# Tuple
+def _handle_tuple(gi_dict, gi_value, children, results, container):
+    data = [results[c] for c in children]
+    return data if container else GlVariant(gi_value.vtype, data)
+
+# Variant, from its only child
+def _handle_variant(gi_dict, gi_value, children, results, container):
+    return results[children[0]]
+
+# Nullable, from its child if any
+def _handle_maybe(gi_dict, gi_value, children, results, container):
+    if len(children) == 0:
+        vt = _vtype(gi_value.vtype)
+        return GLib.Variant.new_maybe(vt, None)
+    return results[children[0]]
+
+# Everything else
+def _handle_leaf(gi_dict, gi_value, children, results, container):
+    val = gi_value.value
+    return val if container else _new_variant(gi_value.vtype, val)
+
+# Handlers by leading type character
+_GATHER_HANDLERS = {
+    'a': _handle_array_or_dict,
+    '[': _handle_array_or_dict,
+    '(': _handle_tuple,
+    'v': _handle_variant,
+    '@': _handle_variant,
+    'm': _handle_maybe,
+}
+
+# Children of arrays, tuples and dictionaries are gathered as plain
+# container data, children of variants and maybes as variants.
+# Other types have no children to gather.
+_GATHER_CHILD_CONTAINER = {'a': True, '[': True, '(': True, 'v': False, '@': False, 'm': False}
+
 class GSettingsEditor(ttk.Frame):
     """
     GSettingsEditor dialog.
@@ -29,27 +129,18 @@ class GSettingsEditor(ttk.Frame):
         super().__init__(parent)
         self.gi_value: GiValue = None
         self.gi_key: GiKey = None
+        self.position : int = None  # Position of the edited value under its parent
         self.root = parent.winfo_toplevel()
         self.process_data(self.root)
-        self.do_layout(parent)      
-        self.place()  
-        self.place_after_id = None
-    
-    # Destructor
-    def destroy(self):
-        if self.place_after_id:
-            self.after_cancel(self.place_after_id)
-        super().destroy()
+        self.do_layout(parent)
 
     # Layout manager
     def do_layout(self, parent):
         # Add widgets
-
-        self.bind_all("<Key>", self.key_handle)
         self.info_frame = ttk.Frame(self)
         self.label_info = tk.Label(self.info_frame, justify="left")
         self.label_info.configure(text=f"Schema: {self.gi_key.get_schema_name()}\nKey: {self.gi_key.get_key_name()}")
-        default_value = get_defaultvalue(self.root.tree, self.gi_key.get_default_value(), self.gi_value)
+        default_value = get_defaultvalue(self.position, self.gi_key.get_default_value(), self.gi_value)
         if default_value != None:
             self.label_info.configure(text=self.label_info["text"] + f"\nDefault: {default_value}")
         self.label_info.pack(side=tk.LEFT, fill=tk.X)
@@ -73,6 +164,7 @@ class GSettingsEditor(ttk.Frame):
             self.edit_value.insert(tk.END, str(self.gi_value.get_value()))
         self.edit_value.pack(side=tk.LEFT, fill=tk.X)
         self.edit_value.focus_set()
+        self.edit_value.bind("<Return>", self.accept_change)
         self.edit_value.bind("<Escape>", self.reject_change)
         self.ok_frame = tk.Frame(self, height=30)
         self.ok_frame.pack(side=tk.BOTTOM, fill=tk.X)
@@ -82,24 +174,19 @@ class GSettingsEditor(ttk.Frame):
         self.button_cancel.pack(side=tk.RIGHT)
         self.message_label = tk.Label(self, justify="left")
         self.message_label.pack(side=tk.LEFT, fill=tk.X)
+        # Keyboard handling for the buttons
+        self.button_ok.bind("<Return>", self.accept_change)
+        self.button_ok.bind("<Escape>", self.reject_change)
+        self.button_cancel.bind("<Return>", self.reject_change)
+        self.button_cancel.bind("<Escape>", self.reject_change)
 
-    def key_handle(self, event):
-        if isinstance(event.widget, ttk.Treeview):
-            return
-        if event.keysym == 'Return':
-            if event.widget is self.button_cancel:
-                self.reject_change()
-            else:
-                self.accept_change()
-        elif event.keysym == 'Escape':
-            self.reject_change()
-   
     # Get data from the parent
     def process_data(self, root):
         tree = root.tree
         gi_dict = root.gi_dict
         item = tree.focus()
         self.gi_key, self.gi_value = gi_dict.get_keyvalue(item)
+        self.position = root.value_position(item)
                     
     # Rebuild tree item
     # Very cool algorithm that gathers a variant from the 
@@ -110,74 +197,99 @@ class GSettingsEditor(ttk.Frame):
         gi_dict : GiDict = self.root.gi_dict
         gi_key, gi_value = gi_dict.get_keyvalue(item_id) 
         root = gi_value.get_key_id()
+        if root == item_id and not gi_value.is_compound():
+            # Scalar key, the edited value is the whole variant
+            return _new_variant(gi_key.key_type, gi_value.get_value())
+        key_type = gi_key.key_type
+        if GlVariant.is_flat(key_type):
+            # Flat array or dictionary: all elements are basic values
+            # directly under the key, no need for the generic walk.
+            is_dict = key_type[1] == '{'
+            # Read the elements straight from the model
+            values = [gi_dict[c] for c in tree.get_children(root)]
+            if is_dict:
+                data = {v.dict_key: v.value for v in values}
+            else:
+                data = [v.value for v in values]
+            return GlVariant(key_type, data)
         data = self.gather_variant(tree, gi_dict, root)
         gi_variant = GlVariant.AssureVariant(gi_key.key_type,data)
         return gi_variant
     
-    # Recursive variant gathereing
+    # Iterative variant gathering
+    # Walks the key subtree post-order with an explicit stack instead of
+    # recursion. Every compound node is visited twice: the first visit
+    # pushes its children, the second one builds the node value from the
+    # child results collected in the results table.
+    # The model attributes are read directly in this loop, the getters
+    # would cost a method call per node.
     def gather_variant(self, tree:ttk.Treeview, gi_dict:GiDict, next, container=False):
-        gi_key, gi_value = gi_dict.get_keyvalue(next)
-        vt_str = gi_value.get_vtype()
-        if not gi_value.is_compound():
-            return gi_value.get_value()
-        else:
-            if vt_str.startswith('a{'):
-                #dictionary
-                dict = {tree.item(id, "text"):self.gather_variant(
-                    tree, gi_dict, id, True) for id in tree.get_children(next)}
-                v = dict if container else GlVariant(vt_str, dict)
-            elif vt_str[0] in "a[(":
-                # Container
-                list = [self.gather_variant(
-                    tree, gi_dict, id, True) for id in tree.get_children(next)]
-                v = list if container else GlVariant(vt_str, list)
-            elif vt_str[0] in "v@":
-                v = self.gather_variant(tree, gi_dict, tree.get_children(next)[0])
-            elif vt_str[0] == 'm':
-                # Nullale 
-                children = tree.get_children(next)
-                if len(children) == 0:
-                    vt = GLib.VariantType(vt_str)
-                    v = GLib.Variant.new_maybe(vt, None)
-                else:
-                    for node in children:
-                        self.gather_variant(tree, gi_dict, node)
-            else:
-                # everything else
-                val = gi_dict.get_value(next).get_value()
-                v = val if container else GlVariant(vt_str, val)
-            if gi_value.is_variant():
+        # Local names for everything used inside the loop
+        get_children = tree.get_children
+        get_keyvalue = gi_dict.get_keyvalue
+        gl_variant = GlVariant
+        handlers = _GATHER_HANDLERS
+        handle_leaf = _handle_leaf
+        child_container = _GATHER_CHILD_CONTAINER
+        results = {}
+        stack = [(next, container, None, None)]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            item_id, in_container, gi_value, children = pop()
+            if gi_value is None:
+                gi_value = get_keyvalue(item_id)[1]
+                if not gi_value.compound:
+                    results[item_id] = gi_value.value
+                    continue
+            vt_str = gi_value.vtype
+            lead = vt_str[0]
+            if children is None:
+                # First visit: expand children, revisit the node when they are done
+                children = get_children(item_id) if lead in child_container else ()
+                push((item_id, in_container, gi_value, children))
+                flag = child_container.get(lead)
+                for child in reversed(children):
+                    push((child, flag, None, None))
+                continue
+            # Second visit: all child results are available
+            handler = handlers.get(lead, handle_leaf)
+            v = handler(gi_dict, gi_value, children, results, in_container)
+            if gi_value.variant:
                 # Variant wrapper
-                v = GlVariant(vt_str, v)
-            return v
-        
+                v = gl_variant(vt_str, v)
+            results[item_id] = v
+        return results[next]
+
     # Accept change
-    def accept_change(self):
+    def accept_change(self, event=None):
         is_ok = True
-        tree = self.root.tree
-        location = self.root.location
+        root = self.root
+        tree = root.tree
+        location = root.location
         selected_item = tree.focus()
         if self.gi_value.get_value() == None:
             # ToDo: Create new value here.
             self.create_value(selected_item)
+        gi_key = self.gi_key
+        gi_value = self.gi_value
         new_value = self.edit_value.get()
         try:
             tree.item(selected_item, values=new_value)
-            if self.gi_value.get_type() == bool and new_value == 'False':
+            value_type = gi_value.get_type()
+            if value_type == bool and new_value == 'False':
                 new_value = False
-            self.gi_value.set_value(self.gi_value.get_type()(new_value))
-            schema_name = self.gi_key.get_schema_name()
-            key_name = self.gi_key.get_key_name()
-            schema = self.root.schema_source.lookup(schema_name, False)
+            gi_value.set_value(value_type(new_value))
+            schema_name = gi_key.get_schema_name()
+            key_name = gi_key.get_key_name()
+            schema = lookup_schema(root.schema_source, schema_name)
             if(schema):
+                # The whole key subtree is needed to gather the variant
+                root.expand_subtree(gi_value.get_key_id())
                 variant = self.rebuild_item(selected_item)
-                if location:
-                    settings = Gio.Settings.new_with_path(schema_name, location)
-                else:
-                    settings = Gio.Settings.new(schema_name)
+                settings = get_settings(schema_name, location)
                 is_ok = settings.set_value(key_name, variant)
         except Exception as e:
-            error_msg = f"{e}";
             self.message_label.configure(text=e)
             is_ok = False
         if is_ok:
@@ -191,7 +303,6 @@ class GSettingsEditor(ttk.Frame):
         return "break"
 
     def create_value(self, item):
-        tree = self.root.tree
         gi_dict = self.root.gi_dict
         key,val = gi_dict.get_keyvalue(item)
         vt_str = key.get_type()
@@ -202,9 +313,6 @@ class GSettingsEditor(ttk.Frame):
         
             
     # Find root key for a data item
+    # Keys and values both hold the item id of their key, no need to walk the tree
     def find_root(self, item):
-        tree = self.root.tree
-        dict = self.root.gi_dict
-        while not isinstance(dict[item], GiKey):
-            item = tree.parent(item)
-        return item
+        return self.root.gi_dict[item].key_id
@@ -28,7 +28,13 @@ python3 gsettings-ui.py
 """ Import section """
 # import from Python
 from os import path
+import sys
 from enum import Enum
+import functools
+import queue
+import re
+import threading
+from collections import OrderedDict
 
 # GIO_VERSION = "2.0"
 import gi
@@ -50,32 +56,32 @@ import gsedit
 from gsedit import GSettingsEditor
 
 """ Implementation starts here """
-class SearchResults(list):
-    """
-    A class to hold search results.
-    It extends the built-in list to provide additional functionality if needed.
-    """
-    def __init__(self, *args, **kwargs):
-        # Costructor for SearchResults
-        self.current_index: int = 0  # Current index in the search results
-        super().__init__(*args, **kwargs)
-    def next(self):
-        #Get the next search result.
-        if self.current_index < len(self) - 1:
-            self.current_index += 1
-        return self[self.current_index] if self else None
-    def previous(self):
-        #Get the previous search result.
-        if self.current_index > 0:
-            self.current_index -= 1
-        return self[self.current_index] if self else None
-    def current(self):
-        #Get the current search result.
-        return self[self.current_index] if self else None
-    def reset(self):
-        #Reset the search results.
-        self.current_index = 0
-        self[:] = []  # Clear the list
+
+""" Cached schema listing """
+# Listing a schema source and looking up every schema in it parses
+# the schema metadata, so it is done once per location.
+# Each entry is (schema_id, schema, key names, installed in the default source).
+@functools.lru_cache(maxsize=8)
+def _schema_source_for(location):
+    default_source = Gio.SettingsSchemaSource.get_default()
+    if location == None:
+        source = default_source
+    else:
+        source = Gio.SettingsSchemaSource.new_from_directory(location, default_source, True)
+    installed, relocatable = source.list_schemas(False)
+    def listing(schema_ids):
+        entries = []
+        for schema_id in schema_ids:
+            schema = source.lookup(schema_id, False)
+            keys = tuple(schema.list_keys()) if schema else ()
+            if source is default_source:
+                # Found in the default source, so installed
+                is_installed = schema is not None
+            else:
+                is_installed = schema is not None and default_source.lookup(schema_id, False) is not None
+            entries.append((schema_id, schema, keys, is_installed))
+        return tuple(entries)
+    return source, listing(installed), listing(relocatable)
 
 class GSettingsViewer(tk.Tk):
     """
@@ -100,17 +106,67 @@ class GSettingsViewer(tk.Tk):
         super().__init__()
         # Constants
         self.MAX_ASCII : int = 256          # Max ASCII key code
-        self. SEARCH_DELAY :int = 300       # At least SEARCH_DELAY between searches
+        self. SEARCH_DELAY :int = 80        # At least SEARCH_DELAY between searches
+        self.SELECTION_DELAY : int = 80     # Selection must settle this long before the text pane is updated
+        self.STUB : str = ":__stub__"       # Item id suffix for placeholder children
+        self.KEY_SEP : str = ":"            # Separates schema node and key name in key item ids
+        self.QUERY_CACHE_SIZE : int = 64    # Max number of cached search queries
+        self.SCAN_POLL : int = 20           # Poll period for running search scans
+        self.SCAN_CHUNK : int = 4096        # Index entries matched between checks for a newer search
+        self.INSERT_ROWS : str = "gsui_insert_rows"     # Tcl proc for batch inserts
+        self.LOAD_POLL : int = 16           # Poll period for a running schema listing
+        self.WIDE_CHARS = re.compile("[\U00010000-\U0010FFFF]")  # Characters Tk text indices count differently
         self.mydir = path.dirname(__file__)
         self.schema_source = None
         self.schema_types = ("Installed", "Relocatable") 
         self.schema_type = tk.StringVar()
         self.location = None
+        self.meta_location = None           # Location the key metadata cache was built for
         # Search results
-        self.search_results : SearchResults = SearchResults()
+        self.search_results : tuple = ()   # Item ids, replaced as a whole by every search
+        self.search_pos : int = 0           # Current position in the search results
+        # Flat search index in tree order, as parallel lists:
+        # item ids, casefolded texts and the positions past each item subtree.
+        # The scan only touches the texts.
+        self.search_ids : list = []
+        self.search_texts : list = []
+        self.search_ends : list = []
+        # Last query and the index positions of all its matches
+        self.last_query : str = ""
+        self.last_hits : list = []
+        # Recent queries and their matches, least recently used first
+        self.query_cache : OrderedDict = OrderedDict()
+        # Search scans running in worker threads
+        self.scan_queue : queue.Queue = queue.Queue()
+        self.scan_token = None              # Identifies the only scan whose results are wanted
+        self.scan_after_id = 0              # ID for the after method polling the scans
+        # Schema listing running in a worker thread
+        self.load_queue : queue.Queue = queue.Queue()
+        self.load_token = None              # Identifies the only listing whose result is wanted
+        self.load_after_id = 0              # ID for the after method polling the listing
         self.after_id = 0  # ID for the after method used in search
+        self.select_after_id = 0  # ID for the after method used in selection
+        self.text_item = None     # Item shown in the text pane
+        self.text_segments : list = []  # (text, tag) segments shown in the text pane
+        self.text_cache : dict = {}     # Text pane segments by item id, built on first selection
+        self.text_wide : bool = False   # Shown segments contain characters above U+FFFF
+        self.layout_after_id = 0  # ID for the after method used in toolbar layout
+        self.toolbar_width = 0    # Last toolbar width seen
+        self.char_widths : dict = {}  # Character width by font description
+        self.toolbar_chars = (0, 0)   # Path and search entry widths last set, in characters
+        self.status_text = ""         # Text shown in the status bar
+        self.search_label_text = "[0/0]"  # Text shown in the search label
         # Gi data dictionary
         self.gi_dict : GiDict = GiDict()
+        # Schema nodes whose keys are not loaded yet: node id -> (schema, location, key names)
+        self.pending_schemas : dict = {}
+        # Container nodes whose children are not inserted yet: node id -> parse_children arguments
+        self.pending_values : dict = {}
+        # Value nodes, keys and schemas follow from their ids:
+        # node id -> (parent id, position under the parent)
+        self.value_parents : dict = {}
+        # Top level schema nodes, as inserted by load_schemas
+        self.top_nodes : list = []
         # Editor
         self.gsedit = None
         # Do UI layout
@@ -191,6 +247,8 @@ class GSettingsViewer(tk.Tk):
         self.tree.heading("Value", text="Value")
         self.tree.column("Value", width=250)
         self.tree.bind("<<TreeviewSelect>>", self.selection_handle)
+        self.tree.bind("<<TreeviewOpen>>", self.open_handle)
+        self.tree_path = str(self.tree)     # Tk path name, for direct Tcl calls
         # Add a vertical scrollbar to the treeview
         self.tree_scrollbar = tk.Scrollbar(self.tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y) 
@@ -200,6 +258,10 @@ class GSettingsViewer(tk.Tk):
         self.tree.bind("<Return>", self.edit_handle)
         # Configure tags
         self.tree.tag_configure("readonly", foreground="grey")
+        # Tcl helper inserting a flat list of rows into a treeview in one call
+        self.tk.eval(f"proc {self.INSERT_ROWS} {{tree rows}} {{"
+                     "foreach {parent iid text image values tags} $rows {"
+                     "$tree insert $parent end -id $iid -text $text -image $image -values $values -tags $tags}}")
         # Text frame for schema details
         self.text_frame = ttk.Frame(self.paned_window)
         self.text_frame.pack(fill=tk.BOTH, expand=True)
@@ -264,59 +326,113 @@ class GSettingsViewer(tk.Tk):
             self.NodeType.COMPOUND:  self.ico_folder,   #ToDo: compound key
             self.NodeType.VALUE:    self.ico_data
         }
+        # Tk image names, for inserting rows without ttk.Treeview.insert
+        self.icon_names = {t: str(image) for t, image in self.icons_dict.items()}
 
     """ GIO Operations """
            
     ## Load schemas
     ## This function loads the GSettings schemas from the system and populates the treeview with them.
+    ## The schema source is listed in a worker thread, so the window stays
+    ## responsive while Gio parses the schema files. The tree is filled
+    ## on the Tk thread once the listing is done.
     def load_schemas(self, schema_type, location=None):
+        # Selection events for deleted items are dropped by selection_handle
+        self.reset_all()
+        # A reload starts with fresh schema lookups and settings objects,
+        # so it sees schemas and values changed outside the editor
+        gsedit.clear_caches()
+        if location != self.meta_location:
+            # Key metadata may differ between schema sources
+            gimodel.clear_key_meta()
+            # And so may the schema listing
+            _schema_source_for.cache_clear()
+            self.meta_location = location
+        self.set_status(f"Loading {schema_type} schemas...")
+        token = self.load_token = object()
+        threading.Thread(target=self.list_schemas, args=(token, schema_type, location), daemon=True).start()
+        if not self.load_after_id:
+            self.load_after_id = self.after(self.LOAD_POLL, self.poll_load)
+
+    ## List schemas
+    ## Runs in a worker thread. Lists the schema source and hands the listing,
+    ## or the error it raised, to the Tk thread through the load queue.
+    def list_schemas(self, token, schema_type, location):
         try:
-            self.reset_all()
-            default_source = None
-            # Clear the treeview
-            default_source = Gio.SettingsSchemaSource.get_default()
-            if location == None:
-                self.schema_source = default_source
-                installed,relocatable = self.schema_source.list_schemas(False)
-            else:
-                # Load schemas from the specified location
-                self.schema_source = Gio.SettingsSchemaSource.new_from_directory(location, Gio.SettingsSchemaSource.get_default(), True)
-                installed, relocatable  = self.schema_source.list_schemas(False)
+            listing = _schema_source_for(location)
+        except Exception as e:
+            listing = e
+        self.load_queue.put((token, schema_type, location, listing))
+
+    ## Poll load
+    ## Picks up the finished listing on the Tk thread, older listings are dropped.
+    def poll_load(self):
+        self.load_after_id = 0
+        try:
+            while True:
+                token, schema_type, location, listing = self.load_queue.get_nowait()
+                if token is self.load_token:
+                    self.load_token = None
+                    self.fill_schemas(schema_type, location, listing)
+        except queue.Empty:
+            pass
+        if self.load_token is not None:
+            self.load_after_id = self.after(self.LOAD_POLL, self.poll_load)
+
+    ## Fill schemas
+    ## Inserts the schema nodes of a finished listing into the cleared treeview.
+    def fill_schemas(self, schema_type, location, listing):
+        # Rows are collected first and inserted into the treeview with a single
+        # Tcl call at the end: parent, item id, text, image, values and tags per row.
+        rows = []
+        row_of = {}     # Item id -> position of its row
+        schema_image = str(self.ico_schema)
+        # Schema nodes by parent and their texts, for the search index
+        children = {"": []}
+        texts = {}
+        # No scrollbar updates while the tree is rebuilt
+        self.freeze_tree()
+        try:
+            if isinstance(listing, Exception):
+                raise listing
+            self.schema_source, installed, relocatable = listing
             schemas = installed if schema_type == 'Installed' else relocatable
-            self.status_bar.config(text=f"{schema_type} Schema Source from {location if location else 'Default Location'}")
+            self.set_status(f"{schema_type} Schema Source from {location if location else 'Default Location'}")
                 
             if not schemas:
-                self.status_bar.config(text="No schemas found.")
+                self.set_status("No schemas found.")
                 return
 
             # Insert schemas into the treeview
-            for schema_id in schemas:
-                schema = self.schema_source.lookup(schema_id, False)
+            for schema_id, schema, keys, installed in schemas:
                 split_id = schema_id.split('.')
                 parent = ""
                 # Build the tree for grouping
                 # It will split the schema name into separate tree items for better navigation
                 for i, part in enumerate(split_id):
-                    node_id = ".".join(split_id[:i+1])
-                    if not self.tree.exists(node_id):
-                        node = self.tree.insert(parent, "end", node_id, text=part, values=(), tags=("type", self.NodeType.SCHEMA), image=self.ico_schema)
-                        self.gi_dict[node] = GiSchema.factory(node_id)
+                    # Schema ids share most of their parts, keep one copy of each
+                    part = sys.intern(part)
+                    node_id = sys.intern(".".join(split_id[:i+1]))
+                    if not node_id in texts:
+                        row_of[node_id] = len(rows)
+                        rows.extend((parent, node_id, part, schema_image, (), ()))
+                        self.gi_dict[node_id] = GiSchema.factory(node_id)
+                        children[parent].append(node_id)
+                        children[node_id] = []
+                        texts[node_id] = part
                     parent = node_id
                 # For relocatable without location and installed with location
                 # we can only list schema names - no data
                 
                 if schema_type == "Relocatable" and not location:
                     # Can't open relocatable schemas without location
-                    self.tree.item(node, values=("Relocatable",))
+                    rows[row_of[parent] + 4] = ("Relocatable",)
                     continue
                 # At this point parent is the full schema_id node
-                # Now parse the settings
-                settings = None
                 if schema:
-                    installed = default_source.lookup(schema.get_id(), False)
                     if (not installed):
                         # Schema not installed
-                        self.tree.item(node, values=("Not installed",))
+                        rows[row_of[parent] + 4] = ("Not installed",)
                         continue
                     #if(not source.get_path()):
                     #    continue
@@ -324,85 +440,292 @@ class GSettingsViewer(tk.Tk):
                         # Check location
                         path = schema.get_path()
                         if(path and path != location):
-                            self.tree.item(node, values=("Wrong location",))
+                            rows[row_of[parent] + 4] = ("Wrong location",)
                             continue
-                        settings = Gio.Settings.new_with_path(schema.get_id(), location)
-                    else:
-                        settings = Gio.Settings.new(schema.get_id())
-                    if settings is None:
-                        # No settings in schema
-                        # This is odd.
-                        continue
-                    # Process keys
-                    for key in schema.list_keys():
-                        val = settings.get_value(key)
-                        data = val.unpack()
-                        self.parse_key(parent, None, key, val, schema, settings)
+                    # Keys are loaded when the node is opened for the first time.
+                    # Until then a stub child keeps the node expandable.
+                    self.pending_schemas[parent] = (schema, location, keys)
+                    rows.extend((parent, parent + self.STUB, "", "", (), ()))
+            self.build_search_index(children, texts)
                             
         except Exception as e:
-            self.status_bar.config(text=f"Error loading schemas: {e}")
+            self.set_status(f"Error loading schemas: {e}")
+        finally:
+            # Insert what was collected, also when loading stopped on an error
+            if rows:
+                self.tk.call(self.INSERT_ROWS, self.tree_path, rows)
+            self.top_nodes = children[""]
+            self.thaw_tree()
 
-    def parse_key(self, parent, key_id, name, data, schema, settings, variant=False):
+    ## Expand schema
+    ## Loads the keys of a schema node the first time it is opened.
+    def expand_schema(self, node):
+        pending = self.pending_schemas.pop(node, None)
+        if pending is None:
+            # Not a schema or already loaded
+            return
+        schema, location, keys = pending
+        rows = []
+        self.freeze_tree()
+        try:
+            self.tree.delete(node + self.STUB)
+            # Now parse the settings
+            # The editor writes through the same cached settings object
+            settings = gsedit.get_settings(schema.get_id(), location)
+            if settings is None:
+                # No settings in schema
+                # This is odd.
+                return
+            # Process keys, their rows are inserted with one Tcl call
+            for key in keys:
+                val = settings.get_value(key)
+                self.parse_key(node, None, key, val, schema, settings, rows=rows)
+        except Exception as e:
+            self.set_status(f"Error loading schema {node}: {e}")
+        finally:
+            # Insert what was collected, also when loading stopped on an error
+            if rows:
+                self.tk.call(self.INSERT_ROWS, self.tree_path, rows)
+            self.thaw_tree()
+
+    ## Freeze tree
+    ## Disconnects the tree from its scrollbar while many rows are inserted.
+    def freeze_tree(self):
+        self.tree.configure(yscrollcommand="")
+
+    ## Thaw tree
+    ## Connects the scrollbar again and brings it up to date.
+    def thaw_tree(self):
+        self.tree.configure(yscrollcommand=self.tree_scrollbar.set)
+        self.tree_scrollbar.set(*self.tree.yview())
+
+    ## Build search index
+    ## Flattens the schema nodes and their keys into the search index, in tree order.
+    ## Keys of schemas that are not loaded yet are indexed by the item id they will get.
+    def build_search_index(self, children, texts):
+        ids = self.search_ids
+        search_texts = self.search_texts
+        ends = self.search_ends
+        sep = self.KEY_SEP
+        # Depth first walk with an explicit stack. A node is pushed twice:
+        # unvisited (start None) and, once its entry is added, to be
+        # finished after its child schema nodes.
+        stack = [(node, None) for node in reversed(children[""])]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            node, start = pop()
+            if start is None:
+                push((node, len(ids)))
+                ids.append(node)
+                search_texts.append(texts[node].casefold())
+                ends.append(0)
+                # Child schema nodes come first, keys are appended on expand
+                stack.extend([(child, None) for child in reversed(children[node])])
+                continue
+            pending = self.pending_schemas.get(node)
+            if pending:
+                # Keys have no subtree in the index, each one ends right after itself
+                keys = pending[2]
+                first = len(ids) + 1
+                prefix = node + sep
+                ids.extend([prefix + key for key in keys])
+                search_texts.extend([key.casefold() for key in keys])
+                ends.extend(range(first, first + len(keys)))
+            ends[start] = len(ids)
+
+    ## Key item id
+    ## Keys get predictable item ids, so that they can be found before their schema is loaded.
+    def key_iid(self, schema_node, key):
+        return f"{schema_node}{self.KEY_SEP}{key}"
+
+    ## Parse key
+    ## Inserts a key or value and its children into the tree.
+    ## The key value is unpacked once at the top. Children get their part of it,
+    ## so nested containers are not unpacked again on every level.
+    ## Variants below a key are not inserted, their content takes their place.
+    ## Nested variants are unwrapped here in a loop rather than through parse_variant,
+    ## unpacking already stripped them so the unpacked value stays the same.
+    ## Key rows can be collected in rows instead, as batch insert rows.
+    def parse_key(self, parent, key_id, name, data, schema, settings, variant=False, unpacked=None, rows=None, position=0):
+        if key_id is not None:
+            while data != None and data.get_type_string() in "v@":
+                data = data.get_child_value(0)
+                variant = True
         # variant type
-        root_key = None
-        nullable = False
         tv = data.get_type_string() if data != None else "?"
-        is_variant = tv in "v@"
+        # Classify the type once
+        is_base = tv[0] in GlVariant.base_type_sig
         gi_dict = self.gi_dict
-
+        icon_names = self.icon_names
+        NodeType = self.NodeType
         # Unpack variant
-        if data != None:
-            unpacked = data.unpack() if tv[0] in GlVariant.base_type_sig else None
-            # Insert new node into tree
-            if tv[0] in GlVariant.base_type_sig:
-                if(key_id is None):
-                    current = self.insert(parent, name, unpacked, self.NodeType.KEY)
-                else:
-                    current = self.insert(parent, name, unpacked, self.NodeType.VALUE)
-                gi_dict.add_gidata(current, key_id, schema, settings, name, data, variant)
+        if data != None and unpacked is None:
+            unpacked = data.unpack()
+        # Shown value and node type
+        if data == None:
+            # If the value is not set, just insert the key
+            val, node_type = "", NodeType.KEY
+        elif is_base:
+            val, node_type = unpacked, NodeType.VALUE
+        else:
+            val, node_type = tv, NodeType.COMPOUND
+        if key_id is None:
+            # Keys have predictable ids, so the model entry comes first
+            # and gives the decoration of the row
+            current = self.key_iid(parent, name)
+            gi_dict.add_gidata(current, key_id, schema, settings, name, data, variant, unpacked, tv)
+            tags = self.key_tags(gi_dict[current])
+            image = icon_names[NodeType.KEY]
+            if rows is None:
+                self.insert(parent, name, val, iid=current, tags=tags, image=image)
             else:
-                # Do not insert variant types into tree. Instead mark data as variant.
-                node_type = self.NodeType.COMPOUND if key_id else self.NodeType.KEY
-                if not is_variant or (is_variant and key_id == None):
-                    current = self.insert(parent, name, tv, node_type)
-                    gi_dict.add_gidata(current, key_id, schema, settings, name, data, variant)
-                if is_variant and key_id != None:
-                    current = parent 
-                    
+                rows.extend((parent, current, name, image, (str(val),), tags))
+        else:
+            # Values take the decoration of their key
+            tags = self.key_tags(gi_dict[key_id])
+            current = self.insert(parent, name, val, tags=tags, image=icon_names[node_type])
+            self.value_parents[current] = (parent, position)
+            gi_dict.add_gidata(current, key_id, schema, settings, name, data, variant, unpacked, tv)
+        if data != None:
             # Handle different types of values
             root_key = current if key_id == None else key_id
-            if tv[0] in "a([":
-                # List types: show key, children as values
-                for i in range(data.n_children()):  # Iterate over array elements
-                    if tv.startswith("a{"):
-                        # dictionary
-                        d = data.get_child_value(i)
-                        k = d.get_child_value(0)
-                        v = d.get_child_value(1)
-                        self.parse_key(current, root_key, k.unpack(), v, schema, settings)
-                    else:          
-                        # list/array/tuple         
-                        d = data.get_child_value(i)
-                        self.parse_key(current, root_key, str(i), d, schema, settings)
-            elif is_variant:
-                for i in range(data.n_children()):
-                    d = data.get_child_value(i)
-                    self.parse_key(current, root_key, name, d, schema, settings, variant=True)
-            elif tv[0] == "m":
-                nullable = True
-                for i in range(data.n_children()):
+            if not is_base and data.n_children() > 0:
+                # Children are parsed when the node is opened for the first time.
+                # Until then a stub child keeps the node expandable.
+                self.pending_values[current] = (root_key, name, tv, data, unpacked, schema, settings)
+                if rows is None:
+                    self.tree.insert(current, "end", current + self.STUB, text="")
+                else:
+                    rows.extend((current, current + self.STUB, "", "", (), ()))
+            else:
+                # Nothing to insert for basic values and empty containers
+                self.parse_children(current, root_key, name, tv, data, unpacked, schema, settings)
+        return current
+
+    ## Parse children
+    ## Inserts the children of a container or variant value under the current node.
+    def parse_children(self, current, root_key, name, tv, data, unpacked, schema, settings):
+        parser = self.CHILD_PARSERS.get(tv[0])
+        if parser:
+            parser(self, current, root_key, name, tv, data, unpacked, schema, settings)
+        elif not tv[0] in GlVariant.base_type_sig:
+            print(f"-->Debug: Unknown variant type {tv}")
+
+    # List types: show key, children as values
+    def parse_list(self, current, root_key, name, tv, data, unpacked, schema, settings):
+        if GlVariant.is_flat(tv):
+            self.insert_flat(current, root_key, tv, data, unpacked)
+        elif tv[1] == "{":
+            # dictionary
+            parse_key = self.parse_key
+            n = data.n_children()
+            if len(unpacked) == n:
+                # The unpacked keys are in entry order, only the values are needed from GLib
+                for i, k in enumerate(unpacked):
+                    v = data.get_child_value(i).get_child_value(1)
+                    parse_key(current, root_key, k, v, schema, settings, unpacked=unpacked[k], position=i)
+            else:
+                # Duplicate keys, unpacking kept only the last value of each.
+                # Every entry unpacks its own value.
+                for i in range(n):
                     d = data.get_child_value(i)
-                    self.parse_key(current, root_key, str(i), d, schema, settings)
+                    k = d.get_child_value(0)
+                    v = d.get_child_value(1)
+                    k = k.unpack()
+                    parse_key(current, root_key, k, v, schema, settings, unpacked=None, position=i)
+        else:
+            # list/array/tuple         
+            parse_key = self.parse_key
+            get_child_value = data.get_child_value
+            for i in range(data.n_children()):  # Iterate over array elements
+                parse_key(current, root_key, str(i), get_child_value(i), schema, settings, unpacked=unpacked[i], position=i)
+
+    # Arrays and dictionaries of basic values
+    # All elements are inserted with one batch call, straight from the unpacked data.
+    # Their item ids are the element positions under the container.
+    # Dictionaries with duplicate keys are read entry by entry from GLib.
+    def insert_flat(self, current, root_key, tv, data, unpacked):
+        is_dict = tv[1] == "{"
+        vtype = tv[3] if is_dict else tv[1]
+        image = self.icon_names.get(self.NodeType.VALUE)
+        tags = self.key_tags(self.gi_dict[root_key])
+        prefix = current + self.KEY_SEP
+        rows = []
+        values = []
+        if is_dict:
+            n = data.n_children()
+            if len(unpacked) == n:
+                items = unpacked.items()
             else:
-                if not tv[0] in GlVariant.base_type_sig:
-                    print(f"-->Debug: Unknown variant type {tv}")
+                # Unpacking kept only the last value of each duplicate key
+                entries = [data.get_child_value(i) for i in range(n)]
+                items = [(d.get_child_value(0).unpack(), d.get_child_value(1).unpack()) for d in entries]
+            for i, (name, value) in enumerate(items):
+                rows.extend((current, prefix + str(i), name, image, (str(value),), tags))
+                values.append((prefix + str(i), name, value))
         else:
-            # If the value is not set, just insert the key
-            current = self.insert(parent, name, "", self.NodeType.KEY)
-            gi_dict.add_gidata(current, key_id, schema, settings, name, data, variant)
-        # Add decorations if there are special key properties present
-        self.maybe_decorate(current)
-        return current
+            for i, value in enumerate(unpacked):
+                name = str(i)
+                rows.extend((current, prefix + name, name, image, (str(value),), tags))
+                values.append((prefix + name, name, value))
+        if rows:
+            self.tk.call(self.INSERT_ROWS, self.tree_path, rows)
+            self.gi_dict.add_values(root_key, vtype, values)
+            self.value_parents.update([(item_id, (current, i)) for i, (item_id, name, value) in enumerate(values)])
+
+    # Variants: unpacking strips the variant, the child has the same value
+    def parse_variant(self, current, root_key, name, tv, data, unpacked, schema, settings):
+        for i in range(data.n_children()):
+            d = data.get_child_value(i)
+            self.parse_key(current, root_key, name, d, schema, settings, variant=True, unpacked=unpacked, position=i)
+
+    # Maybe types: the value if there is one
+    def parse_maybe(self, current, root_key, name, tv, data, unpacked, schema, settings):
+        for i in range(data.n_children()):
+            d = data.get_child_value(i)
+            self.parse_key(current, root_key, str(i), d, schema, settings, unpacked=unpacked, position=i)
+
+    # Child parsers by leading type character
+    CHILD_PARSERS = {
+        'a': parse_list,
+        '(': parse_list,
+        '[': parse_list,
+        'v': parse_variant,
+        '@': parse_variant,
+        'm': parse_maybe,
+    }
+
+    ## Expand value
+    ## Inserts the children of a container value the first time it is opened.
+    def expand_value(self, node):
+        pending = self.pending_values.pop(node, None)
+        if pending is None:
+            # Not a container or already expanded
+            return
+        self.tree.delete(node + self.STUB)
+        self.parse_children(node, *pending)
+        
+    ## Expand node
+    ## Materializes the children of a schema or value node.
+    def expand_node(self, node):
+        if node in self.pending_schemas:
+            self.expand_schema(node)
+        else:
+            self.expand_value(node)
+
+    ## Expand subtree
+    ## Materializes everything below the item, e.g. before the editor gathers a variant from it.
+    def expand_subtree(self, item):
+        stack = [item]
+        self.freeze_tree()
+        try:
+            while stack:
+                node = stack.pop()
+                self.expand_node(node)
+                stack.extend(self.tree.get_children(node))
+        finally:
+            self.thaw_tree()
    
     """ Event handlers"""
     
@@ -410,6 +733,16 @@ class GSettingsViewer(tk.Tk):
     # Makes sure we destroy gsedit in case it was open when the main application
     # was exiting.
     def on_close(self):
+        if self.select_after_id:
+            self.after_cancel(self.select_after_id)
+        if self.scan_after_id:
+            self.after_cancel(self.scan_after_id)
+        if self.load_after_id:
+            self.after_cancel(self.load_after_id)
+        if self.layout_after_id:
+            self.after_cancel(self.layout_after_id)
+        self.scan_token = None
+        self.load_token = None
         if self.gsedit:
             self.gsedit.destroy()
             self.gsedit = None
@@ -420,24 +753,46 @@ class GSettingsViewer(tk.Tk):
     ## This function is called when the toolbar is resized.
     def redo_toolbar_layout(self, event):
         if event:
+            if event.width == self.toolbar_width:
+                # Moved or resized in height only, the layout depends on the width
+                return
             # If an event is passed, adjust the layout based on the new size
-            
-            # Measure font
-            font = tkFont.Font(font=self.path_entry["font"])
-            char_width = font.measure('0') or 10
-            # Reserve space for other widgets
-            # ToDo: May be calculate reserves from sizes of other widgets
-            # (It can make it harder to maintain though)
-            path_reserve = 100
-            search_reserve = 160
-            # Reserve space for buttons and labels
-            # Divide it roughly in half between path and search
-            # ToDo: Maybe add a slider bar in the future.
-            path_text_chars = int(((event.width/2) - path_reserve)/char_width)
-            path_text_chars = max(10, path_text_chars)
-            self.path_entry.config(width=path_text_chars)
-            search_text_chars = int((event.width/2 - search_reserve)/char_width)
-            self.search_text.config(width=max(10,search_text_chars))
+            # Resizing sends bursts of events, only the last size matters
+            self.toolbar_width = event.width
+            if not self.layout_after_id:
+                self.layout_after_id = self.after_idle(self.do_toolbar_layout)
+
+    ## Do toolbar layout
+    ## Splits the toolbar width between the path and search entries.
+    def do_toolbar_layout(self):
+        self.layout_after_id = 0
+        width = self.toolbar_width
+        # Measure font, once per font
+        font = str(self.path_entry["font"])
+        char_width = self.char_widths.get(font)
+        if char_width is None:
+            char_width = tkFont.Font(font=font).measure('0') or 10
+            self.char_widths[font] = char_width
+        # Reserve space for other widgets
+        # ToDo: May be calculate reserves from sizes of other widgets
+        # (It can make it harder to maintain though)
+        path_reserve = 100
+        search_reserve = 160
+        # Reserve space for buttons and labels
+        # Divide it roughly in half between path and search
+        # ToDo: Maybe add a slider bar in the future.
+        path_text_chars = int(((width/2) - path_reserve)/char_width)
+        path_text_chars = max(10, path_text_chars)
+        search_text_chars = int((width/2 - search_reserve)/char_width)
+        search_text_chars = max(10, search_text_chars)
+        # Most resizes move by less than a character, reconfiguring the
+        # entries would only trigger another geometry pass
+        chars = (path_text_chars, search_text_chars)
+        if chars == self.toolbar_chars:
+            return
+        self.toolbar_chars = chars
+        self.path_entry.config(width=path_text_chars)
+        self.search_text.config(width=search_text_chars)
  
     ## Schema type handle
     def schema_type_handle(self, event):
@@ -446,25 +801,46 @@ class GSettingsViewer(tk.Tk):
         location = location if location != '' else None
         self.load_schemas(schema_type, location)
  
+    ## Open handle
+    ## Loads the schema keys or value children when a node is opened for the first time.
+    def open_handle(self, event):
+        self.expand_node(self.tree.focus())
+
     ## Selection Handle
     ## This function is called when a selection is made in the treeview.
     ## It updates the caption of the treeview and populates the table with the selected schema's details.
     def selection_handle(self, event):
         selected_item = self.tree.focus()
+        if not selected_item in self.gi_dict:
+            # Nothing selected or a stub row
+            return
         # Check for the search context
         if len(self.search_results) > 0:
-            search_item = self.search_results.current()
+            search_item = self.search_results[self.search_pos]
             if not selected_item == search_item:
                 # Reset search results if selection changes
-                self.search_results.reset()  
-                self.search_label.config(text=f"[0/0]")
+                self.search_results = ()
+                self.search_pos = 0
+                self.set_search_label("[0/0]")
                 self.search_text.delete(0, tk.END)  # Clear search text
+        # Wait for the selection to settle, e.g. while scrolling with arrow keys
+        if self.select_after_id:
+            self.after_cancel(self.select_after_id)
+        self.select_after_id = self.after(self.SELECTION_DELAY, self.show_selection, selected_item)
+
+    ## Show selection
+    ## Updates the caption of the treeview and the text pane for the selected item.
+    def show_selection(self, selected_item):
+        self.select_after_id = 0
+        if selected_item == self.text_item or not selected_item in self.gi_dict:
+            # Already shown or gone
+            return
         # Update the caption of the treeview
         full_path = self.get_full_path(self.tree, selected_item)
-        item_id = self.tree.item(selected_item, "text")
         self.tree.heading("#0", text=full_path, anchor="w")
         # Update the text pane with details of the selected item
-        self.update_text_pane(selected_item)
+        self.update_text_pane(selected_item, full_path)
+        self.text_item = selected_item
    
     # Start the editor
     def edit_handle(self, event):
@@ -472,8 +848,8 @@ class GSettingsViewer(tk.Tk):
             return
         selected_item = self.tree.focus()
         gi_data = self.gi_dict.get(selected_item, None)
-        if isinstance(gi_data, GiSchema):
-            # Can't edit schemas
+        if gi_data is None or gi_data.__class__ is GiSchema:
+            # Can't edit schemas and stubs
             return
         key,val = self.gi_dict.get_keyvalue(selected_item)
         if not val.is_compound() and key.is_writable():
@@ -511,6 +887,9 @@ class GSettingsViewer(tk.Tk):
         self.gsedit.wait_window()
         # If application is not exiting
         if self.gsedit:
+            # The value may have changed, rebuild it on the next selection
+            self.text_item = None
+            self.text_cache.clear()
             # Set focus back to tree
             self.tree.focus_set()
             # Enable widgets
@@ -545,53 +924,137 @@ class GSettingsViewer(tk.Tk):
             # Cancel the previous search 
             self.after_cancel(self.after_id)  
         # Set a threshold for the search delay
-        self.after_id = self.after(self.SEARCH_DELAY, self.search)  # Perform search after delay
+        self.after_id = self.after(self.SEARCH_DELAY, self.search_when_idle)  # Perform search after delay
+
+    ## Search when idle
+    ## Runs the search once the pending events, e.g. more keystrokes, are handled.
+    def search_when_idle(self):
+        self.after_id = self.after_idle(self.search)
 
     ## Top level search function
-    ## Invokes recursive search along the treee
+    ## Scans the search index in a worker thread, so typing does not wait for it.
+    ## Only a scan that is still current may show its results.
     def search(self):
-        self.search_results.reset()  # Reset search results
-        self.search_label.config(text=f"0 / 0")
         search_text = self.search_text.get() #.strip()
-        if search_text:
-            self.do_search(search_text, "")
+        # For now only search schemas and keys
+        # ToDo: Search Data option?
+        needle = search_text.casefold()
+        if needle and needle == self.last_query and self.search_results and self.scan_token is None:
+            # The text is back to what the shown results are for, e.g. a key typed
+            # and deleted again within the search delay. Keep them and the position.
+            return
+        # Reset search results
+        self.search_results = ()
+        self.search_pos = 0
+        self.set_search_label("[0/0]")
+        # Drop the results of a scan still running
+        self.scan_token = None
+        if not search_text:
+            return
+        hits = self.query_cache.get(needle)
+        if hits is not None:
+            self.query_cache.move_to_end(needle)
+            self.show_results(needle, hits)
+            return
+        base = None
+        if self.last_query and needle.startswith(self.last_query):
+            # The query was extended, matches can only drop out
+            base = self.last_hits
+        else:
+            # After a backspace or a paste, start from the longest cached prefix
+            for n in range(len(needle) - 1, 0, -1):
+                base = self.query_cache.get(needle[:n])
+                if base is not None:
+                    break
+        if base is not None and not base:
+            # Nothing to narrow down, the longer query cannot match either
+            self.show_results(needle, base)
+            return
+        token = self.scan_token = object()
+        threading.Thread(target=self.scan_index, args=(token, needle, self.search_texts, base), daemon=True).start()
+        if not self.scan_after_id:
+            self.scan_after_id = self.after(self.SCAN_POLL, self.poll_scan)
+
+    ## Scan index
+    ## Runs in the worker thread. It only reads the index texts, a plain Python list,
+    ## and hands the index positions of all matches to the Tk thread through the scan queue.
+    ## The texts are matched in chunks, each with a single comprehension,
+    ## and the token is checked between chunks.
+    def scan_index(self, token, needle, texts, base):
+        hits = []
+        extend = hits.extend
+        chunk = self.SCAN_CHUNK
+        if base is None:
+            for start in range(0, len(texts), chunk):
+                if token is not self.scan_token:
+                    # A newer search started
+                    return
+                extend([start + i for i, text in enumerate(texts[start:start + chunk]) if needle in text])
+        else:
+            for start in range(0, len(base), chunk):
+                if token is not self.scan_token:
+                    return
+                extend([i for i in base[start:start + chunk] if needle in texts[i]])
+        self.scan_queue.put((token, needle, hits))
+
+    ## Poll scan
+    ## Picks up finished scans on the Tk thread while a scan is running.
+    def poll_scan(self):
+        self.scan_after_id = 0
+        try:
+            while True:
+                token, needle, hits = self.scan_queue.get_nowait()
+                if token is self.scan_token:
+                    self.scan_token = None
+                    query_cache = self.query_cache
+                    query_cache[needle] = hits
+                    if len(query_cache) > self.QUERY_CACHE_SIZE:
+                        query_cache.popitem(last=False)
+                    self.show_results(needle, hits)
+        except queue.Empty:
+            pass
+        if self.scan_token is not None:
+            self.scan_after_id = self.after(self.SCAN_POLL, self.poll_scan)
+
+    ## Show results
+    ## Turns the index matches of a query into search results and selects the first one.
+    ## Like the tree walk it replaces, it does not look inside matched items.
+    def show_results(self, needle, hits):
+        self.last_query, self.last_hits = needle, hits
+        ids = self.search_ids
+        ends = self.search_ends
+        # Matches inside a matched subtree are not results
+        results = []
+        append = results.append
+        end = 0
+        for i in hits:
+            if i < end:
+                continue
+            append(ids[i])
+            end = ends[i]
+        self.search_results = tuple(results)
         if len(self.search_results) > 0:
-            self.search_label.config(text=f"[1/{len(self.search_results)}]")
+            self.set_search_label(f"[1/{len(self.search_results)}]")
             first_result = self.search_results[0]
             self.select_and_focus(first_result)
-       
-    ## Do search
-    ## This function performs a recursive search in the treeview for the given search text.
-    def do_search(self, search_text, root):
-        for item_id in self.tree.get_children(root):
-            if type(self.gi_dict[item_id]) in [GiSchema, GiKey]:
-                # For now only search schemas and keys
-                # ToDo: Search Data option?
-                text = self.tree.item(item_id, "text")            
-                if search_text.lower() in text.lower():
-                    self.search_results.append(item_id)
-                else:
-                    self.do_search(search_text, item_id)
                 
     ## Search previous result
     def search_prev(self):
-        if len(self.search_results) > 0:
-            current = self.search_results.previous()
-            if current:
-                self.select_and_focus(current)
-                self.search_label.config(text=f"[{self.search_results.current_index+1}/{len(self.search_results)}]")
+        self.navigate(-1)
 
     ## Search next result
     def search_next(self):
-        if len(self.search_results) > 0:
-            if self.search_results.current_index == len(self.search_results) - 1:
-                return  # No more results to show
-            # Get the next item in the search results
-            current = self.search_results.next()
-            if current:
-                self.select_and_focus(current)
-                self.tree.yview_scroll(1, "units")  # Scroll to the item
-                self.search_label.config(text=f"[{self.search_results.current_index+1}/{len(self.search_results)}]")
+        self.navigate(1)
+
+    ## Navigate
+    ## Moves delta places through the search results and shows the result there.
+    def navigate(self, delta):
+        results = self.search_results
+        pos = self.search_pos + delta
+        if 0 <= pos < len(results):
+            self.search_pos = pos
+            self.select_and_focus(results[pos])
+            self.set_search_label(f"[{pos+1}/{len(results)}]")
 
     ## Copy text handle
     def copy_text(self, event):
@@ -621,7 +1084,7 @@ class GSettingsViewer(tk.Tk):
             if(location[-1] != '/'):
                 location += '/'
             if not Gio.File.new_for_path(location).query_exists(None):
-                self.status_bar.config(text=f"Path {location} does not exist.")
+                self.set_status(f"Path {location} does not exist.")
                 return
         # Remember location
         self.location = location
@@ -639,109 +1102,259 @@ class GSettingsViewer(tk.Tk):
     # Clear text, tree and dictionary
     def reset_all(self):
         self.gi_dict.clear()  # Clear the GiData dictionary
-        self.tree.delete(*self.tree.get_children())
+        self.pending_schemas.clear()
+        self.pending_values.clear()
+        self.value_parents.clear()
+        # New lists, a running scan may still read the old ones
+        self.search_ids, self.search_texts, self.search_ends = [], [], []
+        self.scan_token = None
+        self.last_query, self.last_hits = "", []
+        self.query_cache.clear()
+        self.text_item = None
+        self.text_cache.clear()
+        self.tree.delete(*self.top_nodes)
+        self.top_nodes = []
         self.text.config(state=tk.NORMAL)
         self.text.delete(1.0, tk.END)
         self.text.config(state=tk.DISABLED)
+        self.text_segments = []
+        self.text_wide = False
     
     ## Get full path
     ## Helper function for getting the full path of a selected item in the treeview.    
+    ## Schema and key paths follow from the model. Values below a key
+    ## add their names, walking up through the recorded parents.
     def get_full_path(self, tree, item):
-        path = []
+        names = []
+        gi_dict = self.gi_dict
+        value_parents = self.value_parents
+        head = None
         while item:
-            path.append(tree.item(item, "text"))
-            item = tree.parent(item)
-        return ".".join(reversed(path))
+            gi_data = gi_dict.get(item)
+            data_class = gi_data.__class__
+            if data_class is GiSchema:
+                # Schema node ids are the dotted paths
+                head = item
+                break
+            if data_class is GiKey:
+                head = f"{gi_data.schema_name}.{gi_data.key_name}"
+                break
+            # The value name is its tree text
+            names.append(str(gi_data.dict_key))
+            item = value_parents[item][0]
+        if not names:
+            # Schemas and keys, no list to build
+            return head or ""
+        if head is not None:
+            names.append(head)
+        names.reverse()
+        return ".".join(names)
+
+    ## Value position
+    ## Position of a value node under its parent, without asking the tree. None for other nodes.
+    def value_position(self, item):
+        entry = self.value_parents.get(item)
+        return entry[1] if entry else None
+
+    ## Set status
+    ## Shows the text in the status bar, unless it is shown already.
+    def set_status(self, text):
+        if text != self.status_text:
+            self.status_text = text
+            self.status_bar.config(text=text)
+
+    ## Set search label
+    ## Shows the result position in the search label, unless it is shown already.
+    def set_search_label(self, text):
+        if text != self.search_label_text:
+            self.search_label_text = text
+            self.search_label.config(text=text)
 
     ## Select and focus
     ## This function selects and focuses the given item in the treeview.
     def select_and_focus(self, item):
         """Select and focus the given item in the treeview."""
-        self.tree.update_idletasks()  # Ensure the treeview is updated
+        # see() opens every ancestor without <<TreeviewOpen>>, so load the
+        # schemas on the way first. Item ids start with their schema node id.
+        schema_node = item.partition(self.KEY_SEP)[0]
+        parts = schema_node.split(".")
+        pending_schemas = self.pending_schemas
+        for i in range(1, len(parts) + 1):
+            node = ".".join(parts[:i])
+            if node != item and node in pending_schemas:
+                self.expand_schema(node)
+        # Every tree item has its gi_dict entry, no need to ask Tk
+        if not item in self.gi_dict:
+            return
+        # see() works on the tree model, no need to flush pending redraws first
         self.tree.see(item)
         self.tree.selection_set(item)
         self.tree.focus(item)
+        # A single programmatic selection, show it without waiting for the selection to settle.
+        # The selection event that follows finds it shown already.
+        if self.select_after_id:
+            self.after_cancel(self.select_after_id)
+        self.show_selection(item)
        
     ## Insert
     ## This function inserts a new item into the treeview with the given key, value, type, and image.
     ## It returns the ID of the newly inserted item.
-    def insert(self, parent, key, val, type):
-        values = (str(val),)
-        image = self.icons_dict.get(type, self.ico_empty)
-        return self.tree.insert(parent, "end", text=key, values=values, image=image)
+    ## The Tcl command is called directly, ttk.Treeview.insert would
+    ## process its options in Python for every row.
+    ## Callers that already know the icon pass its name as image.
+    ## Rows have no tags by default, the option is only passed when there are some.
+    def insert(self, parent, key, val, type=None, iid="", tags=(), image=None):
+        image = image or self.icon_names.get(type) or str(self.ico_empty)
+        options = ("-text", key, "-values", (str(val),), "-image", image)
+        if tags:
+            options += ("-tags", tags)
+        if iid:
+            return self.tk.call(self.tree_path, "insert", parent, "end", "-id", iid, *options)
+        return self.tk.call(self.tree_path, "insert", parent, "end", *options)
 
-    # Maybe decorate. It adds decorations to tree items based on key properties. 
+    # Key tags. The decorations of tree items based on key properties.
     # Right now we only decorate read-only keys, but this can change.
-    def maybe_decorate(self, current):
-        tree = self.tree
-        key, val = self.gi_dict.get_keyvalue(current)
-        if not key.is_writable():
-            tree.item(current, tags=("readonly",))
+    def key_tags(self, gi_key):
+        return () if gi_key.writable else ("readonly",)
             
     ## Update text pane
     ## This function updates the text pane with details of the selected item in the treeview.
-    def update_text_pane(self, selected_item):
-        gi_dict = self.gi_dict
-        gi_data = gi_dict.get_data(selected_item)
-        if isinstance(gi_data, GiSchema):
+    ## The segments are built once per item and kept until the next reload or edit.
+    def update_text_pane(self, selected_item, full_path):
+        segments = self.text_cache.get(selected_item)
+        if segments is None:
+            segments = self.build_text_segments(selected_item, full_path)
+            self.text_cache[selected_item] = segments
+        self.show_segments(segments)
+
+    ## Build text segments
+    ## Collects the details of the given item as (text, tag) segments for the text pane.
+    def build_text_segments(self, selected_item, full_path):
+        gi_data = self.gi_dict.get_data(selected_item)
+        data_class = gi_data.__class__
+        if data_class is GiSchema:
             gi_key, gi_value = (None, None)
+        elif data_class is GiKey:
+            gi_key, gi_value = (gi_data, gi_data.value)
         else:
-            gi_key, gi_value = self.gi_dict.get_keyvalue(selected_item)
+            gi_key, gi_value = (gi_data.key, gi_data)
                 
-        # Set up the text pane
-        self.text.config(state=tk.NORMAL)
-        self.text.delete(1.0, tk.END)
+        # Collect the text pane content as (text, tag) segments
+        segments = []
+        add = segments.append
         # Insert the full path in the text pane
-        full_path = self.get_full_path(self.tree, selected_item)
-        self.text.insert(tk.END, full_path + "\n\n", "underline_blue")
+        add((full_path + "\n\n", "underline_blue"))
         # Show the description and value
-        values = self.tree.item(selected_item, "values")
-        text = self.tree.item(selected_item, "text")
-        
+        # The model classes are plain slotted records, read their fields directly
         if gi_key:
             # If GiData is available, show its schema ID
-            self.text.insert(tk.END, "Schema ID: ", "bold_blue")
-            self.text.insert(tk.END, f"{gi_key.get_schema_name()}\n")
+            add(("Schema ID: ", "bold_blue"))
+            add((gi_key.schema_name + "\n", ""))
             # If key is present, show it
-            if gi_key.get_key_name():
-                self.text.insert(tk.END, "Key: ", "bold_blue")
-                self.text.insert(tk.END, f"{gi_key.get_key_name()}")
+            if gi_key.key_name:
+                add(("Key: ", "bold_blue"))
+                add((gi_key.key_name, ""))
                 # If summary is present, show it 
-                if gi_key.get_summary():
-                    self.text.insert(tk.END, f"\t({gi_key.get_summary()})\n")
+                if gi_key.summary:
+                    add((f"\t({gi_key.summary})\n", ""))
             # If read-only
-            if not gi_key.is_writable():
-                self.text.insert(tk.END, "Read Only\n", "bold_red")
-            self.text.insert(tk.END, "\n")
+            if not gi_key.writable:
+                add(("Read Only\n", "bold_red"))
+            add(("\n", ""))
             #if key type present, show it
-            if gi_key.get_key_type():
-                self.text.insert(tk.END, "\nKey type: ", "bold_blue")
-                self.text.insert(tk.END, f"{gi_key.get_key_type()}\n", "bold_blue")
+            if gi_key.key_type:
+                add(("\nKey type: ", "bold_blue"))
+                add((gi_key.key_type + "\n", "bold_blue"))
             # If description is present, show it
-            if gi_key.get_description():
-                self.text.insert(tk.END, "Description: ", "bold_blue")
-                self.text.insert(tk.END, f"\n{gi_key.get_description()}\n")
+            if gi_key.description:
+                add(("Description: ", "bold_blue"))
+                add((f"\n{gi_key.description}\n", ""))
         if gi_value:
             # Show the value if present
-            self.text.insert(tk.END, f"Value: {gi_value.get_vtype()} ", "bold_blue")
-            if gi_value.is_compound():
-                self.text.insert(tk.END, "\n<<Compound>>\n")
+            add((f"Value: {gi_value.vtype} ", "bold_blue"))
+            if gi_value.compound:
+                add(("\n<<Compound>>\n", ""))
             else:
-                self.text.insert(tk.END, f"\n{gi_value.get_value()}\n") 
+                add((f"\n{gi_value.value}\n", ""))
         if gi_key:
             # If default value if present
-            default_value =  get_defaultvalue(self.tree, gi_key.get_default_value(), gi_value)
+            default_value =  get_defaultvalue(self.value_position(selected_item), gi_key.default_value, gi_value)
             if default_value != None:
-                self.text.insert(tk.END, f"Default Value: ", "bold_blue")
-                self.text.insert(tk.END, f"\n{default_value}\n")
+                add(("Default Value: ", "bold_blue"))
+                add((f"\n{default_value}\n", ""))
             # If range is present, show it
-            if gi_key.get_range():
-                t,v = gi_key.get_range()
+            if gi_key.range:
+                t,v = gi_key.range
                 if len(v) > 0:
-                    self.text.insert(tk.END, "Range: ", "bold_blue")
-                    self.text.insert(tk.END, f"\n{t} : {v}")
+                    add(("Range: ", "bold_blue"))
+                    add((f"\n{t} : {v}", ""))
+        # Adjacent segments with the same tag are inserted as one
+        merged = []
+        for chars, tag in segments:
+            if merged and merged[-1][1] == tag:
+                merged[-1] = (merged[-1][0] + chars, tag)
+            else:
+                merged.append((chars, tag))
+        return merged
+
+    ## Show segments
+    ## Updates the text pane to the given (text, tag) segments.
+    ## Only runs of segments that differ from the shown ones are replaced,
+    ## so moving between similar keys does not rebuild the whole pane.
+    def show_segments(self, segments):
+        shown = self.text_segments
+        if shown == segments:
+            return
+        # Tk counts characters above U+FFFF differently from len(),
+        # so character offsets are only safe without them
+        wide = self.WIDE_CHARS.search("".join([chars for chars, tag in segments])) is not None
+        if wide or self.text_wide:
+            # Replace everything
+            runs = [(0, None)]
+        elif len(shown) == len(segments):
+            # Same layout: runs of changed segments as (first, past last)
+            runs = []
+            i, n = 0, len(segments)
+            while i < n:
+                if shown[i] == segments[i]:
+                    i += 1
+                    continue
+                j = i + 1
+                while j < n and shown[j] != segments[j]:
+                    j += 1
+                runs.append((i, j))
+                i = j
+        else:
+            # Different layout: replace everything past the common prefix
+            common = 0
+            for old, new in zip(shown, segments):
+                if old != new:
+                    break
+                common += 1
+            runs = [(common, None)]
+        # Character offsets of the shown segments
+        offsets = [0]
+        for chars, tag in shown:
+            offsets.append(offsets[-1] + len(chars))
+        text = self.text
+        text.config(state=tk.NORMAL)
+        # Replace from the end, so that the offsets of earlier runs stay valid
+        for first, last in reversed(runs):
+            start = f"1.0 + {offsets[first]} chars"
+            if last is None:
+                end, new = tk.END, segments[first:]
+            else:
+                end, new = f"1.0 + {offsets[last]} chars", segments[first:last]
+            args = [part for segment in new for part in segment]
+            if args:
+                # One Tcl call for the delete and the insert
+                text.replace(start, end, *args)
+            else:
+                text.delete(start, end)
         # Lock the text pane
-        self.text.config(state=tk.DISABLED)
+        text.config(state=tk.DISABLED)
+        self.text_segments = segments
+        self.text_wide = wide
     
  
 """ Main function """
@@ -0,0 +1,119 @@
+""" Tests for parsing dictionary values into the tree """
+import importlib.util
+import sys
+import unittest
+from os import path
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    spec = importlib.util.spec_from_file_location("gsettings_ui", path.join(ROOT, "gsettings-ui.py"))
+    gsettings_ui = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gsettings_ui)
+except ImportError as e:
+    raise unittest.SkipTest(f"gsettings-ui dependencies not available: {e}")
+
+GSettingsViewer = gsettings_ui.GSettingsViewer
+
+
+class FakeVariant:
+    """ A GLib.Variant stand-in with explicit children """
+    def __init__(self, type_string, value, children=()):
+        self.type_string = type_string
+        self.value = value
+        self.children = list(children)
+
+    def get_type_string(self):
+        return self.type_string
+
+    def unpack(self):
+        return self.value
+
+    def n_children(self):
+        return len(self.children)
+
+    def get_child_value(self, i):
+        return self.children[i]
+
+
+def pair(a, b):
+    return FakeVariant("(ii)", (a, b), [FakeVariant("i", a), FakeVariant("i", b)])
+
+
+def entry(key, value):
+    return FakeVariant("{s(ii)}", (key, value.value), [FakeVariant("s", key), value])
+
+
+class FakeTree:
+    def __init__(self):
+        self.rows = {}
+
+    def insert(self, parent, index, iid, **options):
+        self.rows[iid] = parent
+
+
+class FakeTk:
+    """ Records the rows inserted through the direct Tcl insert """
+    def __init__(self):
+        self.rows = []
+
+    def call(self, *args):
+        if args[0] == "insert_rows":
+            # Batch insert: the rows come as one flat list
+            self.rows.append((None, list(args[2])))
+            return ""
+        tree_path, command, parent, index, *options = args
+        iid = f"I{len(self.rows) + 1:03}"
+        self.rows.append((iid, parent, dict(zip(options[::2], options[1::2]))))
+        return iid
+
+
+class ParseListTest(unittest.TestCase):
+    def make_viewer(self):
+        viewer = GSettingsViewer.__new__(GSettingsViewer)
+        viewer.__dict__.update(
+            tree=FakeTree(), tk=FakeTk(), tree_path=".tree", STUB=":__stub__", KEY_SEP=":",
+            gi_dict=gsettings_ui.GiDict(), pending_values={}, value_parents={},
+            icon_names={t: t.name for t in GSettingsViewer.NodeType})
+        key_id = "org.a:k"
+        viewer.gi_dict[key_id] = gsettings_ui.GiKey("org.a", "k", key_id)
+        return viewer, key_id
+
+    def test_duplicate_keys_keep_their_own_values(self):
+        viewer, key_id = self.make_viewer()
+        # Unpacking a dictionary keeps the last value of a repeated key
+        data = FakeVariant("a{s(ii)}", {"x": (3, 4), "y": (5, 6)},
+                           [entry("x", pair(1, 2)), entry("x", pair(3, 4)), entry("y", pair(5, 6))])
+        viewer.parse_list(key_id, key_id, "k", data.type_string, data, data.value, None, None)
+        rows = viewer.tk.rows
+        self.assertEqual([options["-text"] for iid, parent, options in rows], ["x", "x", "y"])
+        values = [viewer.gi_dict[iid].value for iid, parent, options in rows]
+        self.assertEqual(values, [(1, 2), (3, 4), (5, 6)])
+        self.assertEqual([viewer.value_position(iid) for iid, parent, options in rows], [0, 1, 2])
+
+    def test_unique_keys(self):
+        viewer, key_id = self.make_viewer()
+        data = FakeVariant("a{s(ii)}", {"x": (1, 2), "y": (5, 6)},
+                           [entry("x", pair(1, 2)), entry("y", pair(5, 6))])
+        viewer.parse_list(key_id, key_id, "k", data.type_string, data, data.value, None, None)
+        values = [viewer.gi_dict[iid].value for iid, parent, options in viewer.tk.rows]
+        self.assertEqual(values, [(1, 2), (5, 6)])
+
+    def test_duplicate_keys_in_flat_dictionary(self):
+        viewer, key_id = self.make_viewer()
+        viewer.INSERT_ROWS = "insert_rows"
+        data = FakeVariant("a{si}", {"x": 2, "y": 3},
+                           [FakeVariant("{si}", ("x", 1), [FakeVariant("s", "x"), FakeVariant("i", 1)]),
+                            FakeVariant("{si}", ("x", 2), [FakeVariant("s", "x"), FakeVariant("i", 2)]),
+                            FakeVariant("{si}", ("y", 3), [FakeVariant("s", "y"), FakeVariant("i", 3)])])
+        viewer.parse_list(key_id, key_id, "k", data.type_string, data, data.value, None, None)
+        rows = viewer.tk.rows[0][1]
+        item_ids = rows[1::6]
+        self.assertEqual(rows[2::6], ["x", "x", "y"])
+        self.assertEqual([viewer.gi_dict[iid].value for iid in item_ids], [1, 2, 3])
+        self.assertEqual([viewer.value_position(iid) for iid in item_ids], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+""" Tests for jumping to search results in schemas that are not loaded yet """
+import importlib.util
+import sys
+import unittest
+from os import path
+from unittest import mock
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    spec = importlib.util.spec_from_file_location("gsettings_ui", path.join(ROOT, "gsettings-ui.py"))
+    gsettings_ui = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gsettings_ui)
+except ImportError as e:
+    raise unittest.SkipTest(f"gsettings-ui dependencies not available: {e}")
+
+GSettingsViewer = gsettings_ui.GSettingsViewer
+
+
+class FakeTree:
+    """ Just enough of ttk.Treeview: parents, children and open state """
+    def __init__(self):
+        self.children = {"": []}
+        self.parents = {}
+        self.opened = set()
+
+    def add(self, parent, iid):
+        self.children[parent].append(iid)
+        self.children[iid] = []
+        self.parents[iid] = parent
+
+    def insert(self, parent, index, iid, **options):
+        self.add(parent, iid)
+
+    def delete(self, *items):
+        for iid in items:
+            self.children[self.parents.pop(iid)].remove(iid)
+
+    def see(self, iid):
+        # Opens every ancestor, like Tk, without <<TreeviewOpen>>
+        parent = self.parents[iid]
+        while parent:
+            self.opened.add(parent)
+            parent = self.parents[parent]
+
+    def selection_set(self, iid):
+        pass
+
+    def focus(self, iid):
+        pass
+
+
+class FakeTk:
+    """ Runs the viewer's batch insert proc against the fake tree """
+    def __init__(self, tree):
+        self.tree = tree
+
+    def call(self, proc, tree_path, rows):
+        for i in range(0, len(rows), 6):
+            self.tree.add(rows[i], rows[i + 1])
+
+
+class FakeVariant:
+    def __init__(self, value):
+        self.value = value
+
+    def get_type_string(self):
+        return "b"
+
+    def unpack(self):
+        return self.value
+
+
+class FakeSchema:
+    def __init__(self, schema_id):
+        self.schema_id = schema_id
+
+    def get_id(self):
+        return self.schema_id
+
+    def get_key(self, key):
+        return None
+
+
+class FakeSettings:
+    def get_value(self, key):
+        return FakeVariant(True)
+
+    def is_writable(self, key):
+        return True
+
+
+class SelectAndFocusTest(unittest.TestCase):
+    def make_viewer(self):
+        viewer = GSettingsViewer.__new__(GSettingsViewer)
+        tree = FakeTree()
+        viewer.__dict__.update(
+            tree=tree, tk=FakeTk(tree), tree_path=".tree", INSERT_ROWS="insert_rows",
+            STUB=":__stub__", KEY_SEP=":", gi_dict=gsettings_ui.GiDict(),
+            pending_schemas={}, pending_values={}, value_parents={}, select_after_id=0,
+            icon_names={t: t.name for t in GSettingsViewer.NodeType})
+        viewer.freeze_tree = viewer.thaw_tree = lambda: None
+        viewer.show_selection = lambda item: None
+        # org.gnome.mutter and its child schema org.gnome.mutter.keybindings, both not loaded
+        parent = ""
+        for node in ("org", "org.gnome", "org.gnome.mutter", "org.gnome.mutter.keybindings"):
+            tree.add(parent, node)
+            viewer.gi_dict[node] = gsettings_ui.GiSchema.factory(node)
+            parent = node
+        for node, keys in (("org.gnome.mutter", ("overlay-key",)),
+                           ("org.gnome.mutter.keybindings", ("toggle-tiled-left",))):
+            viewer.pending_schemas[node] = (FakeSchema(node), None, keys)
+            tree.add(node, node + viewer.STUB)
+        return viewer
+
+    def test_hit_below_pending_parent_schema_loads_the_parent(self):
+        viewer = self.make_viewer()
+        item = "org.gnome.mutter.keybindings:toggle-tiled-left"
+        with mock.patch.object(gsettings_ui.gsedit, "get_settings", return_value=FakeSettings()):
+            viewer.select_and_focus(item)
+        tree = viewer.tree
+        self.assertIn(item, viewer.gi_dict)
+        self.assertIn("org.gnome.mutter", tree.opened)
+        self.assertIn("org.gnome.mutter:overlay-key", tree.children["org.gnome.mutter"])
+        for node in tree.opened:
+            for child in tree.children[node]:
+                self.assertFalse(child.endswith(viewer.STUB), f"stub row visible under {node}")
+
+    def test_schema_hit_stays_unloaded(self):
+        viewer = self.make_viewer()
+        with mock.patch.object(gsettings_ui.gsedit, "get_settings", return_value=FakeSettings()):
+            viewer.select_and_focus("org.gnome.mutter.keybindings")
+        # see() does not open the item itself, only its ancestors
+        self.assertIn("org.gnome.mutter.keybindings", viewer.pending_schemas)
+        self.assertNotIn("org.gnome.mutter", viewer.pending_schemas)
+
+
+if __name__ == "__main__":
+    unittest.main()